@@ -1,5 +1,7 @@
 import random
 
+import numpy as np
+
 from keras_hub.src.api_export import keras_hub_export
 from keras_hub.src.layers.preprocessing.preprocessing_layer import (
     PreprocessingLayer,
@@ -15,6 +17,49 @@ except ImportError:
     tf = None
 
 
+def _swap_indices(candidates, row_ids, row_starts, num_to_select, seed):
+    """Randomly pair up candidate token indices within each row.
+
+    Candidates are shuffled within their row by sorting on a random key offset
+    by the row id, and the first `2 * num_to_select` shuffled candidates of
+    each row are paired up. Returns `(destinations, sources)` such that moving
+    the token at every source index to its destination index performs all
+    swaps. Unselected candidates map to themselves, which keeps every shape
+    static for XLA.
+    """
+    keys = tf.random.stateless_uniform(
+        shape=tf.shape(row_ids),
+        minval=0,
+        maxval=2**31 - 1,
+        dtype=tf.int64,
+        seed=seed,
+        # Pin the algorithm so XLA and non-XLA calls draw the same keys.
+        alg="philox",
+    )
+    order = tf.argsort(row_ids * 2**31 + keys)
+    shuffled = tf.gather(candidates, order)
+    indices = tf.range(tf.size(row_ids, out_type=tf.int64))
+    rank = indices - row_starts
+    selected = rank < 2 * tf.gather(num_to_select, row_ids)
+    partners = tf.where(selected, indices + 1 - 2 * (rank % 2), indices)
+    return shuffled, tf.gather(shuffled, partners)
+
+
+# Shared by all layers, so the fixed signature is only traced once per mode.
+if tf is not None:
+    _SWAP_INDICES_SIGNATURE = [tf.TensorSpec([None], "int64")] * 4 + [
+        tf.TensorSpec([2], "int64")
+    ]
+    _swap_indices_fn = tf.function(
+        _swap_indices, input_signature=_SWAP_INDICES_SIGNATURE
+    )
+    _swap_indices_xla_fn = tf.function(
+        _swap_indices,
+        jit_compile=True,
+        input_signature=_SWAP_INDICES_SIGNATURE,
+    )
+
+
 @keras_hub_export("keras_hub.layers.RandomSwap")
 class RandomSwap(PreprocessingLayer):
     """Augments input by randomly swapping words.
@@ -33,7 +78,9 @@ class RandomSwap(PreprocessingLayer):
 
     Args:
         rate: The probability of a given token being chosen to be swapped
-            with another random token.
+            with another random token. Each swap exchanges a disjoint pair
+            of tokens, so the number of swaps in a sequence is capped at
+            half its number of candidate tokens.
         max_swaps: The maximum number of swaps to be performed.
         skip_list: A list of token values that should not be considered
             candidates for deletion.
@@ -41,14 +88,35 @@ class RandomSwap(PreprocessingLayer):
             returns as output a scalar tensor True/False value. A value of
             True indicates that the token should not be considered a
             candidate for deletion. This function must be tracable--it
-            should consist of tensorflow operations.
+            should consist of tensorflow operations. The function is
+            vectorized over all tokens with `tf.vectorized_map` where
+            possible, and otherwise mapped over each token individually,
+            which is much slower.
         skip_py_fn: A function that takes as input a python token value and
             returns as output `True` or `False`. A value of True
             indicates that should not be considered a candidate for deletion.
             Unlike the `skip_fn` argument, this argument need not be
             tracable--it can be any python function.
+        skip_fn_vectorized: bool. If `True`, `skip_fn` is instead called
+            once on a rank 1 tensor of all tokens, and must return a boolean
+            tensor of the same shape. This is the fastest option for
+            predicates that already work elementwise, such as
+            `tf.strings.regex_full_match`. Defaults to `False`.
         seed: A seed for the random number generator.
-
+        jit_compile: bool. If `True`, the computation of the swap indices is
+            compiled with XLA. XLA recompiles for every distinct number of
+            tokens, so this is only worthwhile for inputs with a fixed shape.
+            Defaults to `False`.
+
+    Call arguments:
+        inputs: A `tf.Tensor`, `tf.RaggedTensor`, or list of tokens.
+        seed: A shape `(2,)` integer seed. If passed, all randomness of the
+            call is derived statelessly from this seed instead of the layer's
+            random generator, and the same seed always produces the same
+            augmentation. This keeps the call free of stateful ops, so the
+            layer can be used with `tf.data.Dataset.map` and
+            `num_parallel_calls=tf.data.AUTOTUNE`. Prefer batching before
+            mapping, which amortizes the per-call overhead over the batch.
 
     Examples:
 
@@ -59,7 +127,7 @@ class RandomSwap(PreprocessingLayer):
     >>> augmenter = keras_hub.layers.RandomSwap(rate=0.4, seed=42)
     >>> y = augmenter(x)
     >>> list(map(lambda y: " ".join(y), y))
-    ['like I Hey', 'and Keras Tensorflow']
+    ['Hey I like', 'Keras Tensorflow and']
 
     Character level usage.
     >>> keras.utils.set_random_seed(1337)
@@ -68,7 +136,15 @@ class RandomSwap(PreprocessingLayer):
     >>> augmenter = keras_hub.layers.RandomSwap(rate=0.4, seed=42)
     >>> y = augmenter(x)
     >>> list(map(lambda y: "".join(y), y))
-    ['deD yuHe', 'SUede pp']
+    ['Hey Dude', 'pSp deUe']
+
+    Usage with a per-call seed.
+    >>> x = ["Hey I like", "Keras and Tensorflow"]
+    >>> x = list(map(lambda x: x.split(), x))
+    >>> augmenter = keras_hub.layers.RandomSwap(rate=0.4)
+    >>> y = augmenter(x, seed=[1, 2])
+    >>> list(map(lambda y: " ".join(y), y))
+    ['Hey like I', 'and Keras Tensorflow']
 
     Usage with skip_list.
     >>> keras.utils.set_random_seed(1337)
@@ -78,7 +154,7 @@ class RandomSwap(PreprocessingLayer):
     ...     skip_list=["Keras"], seed=42)
     >>> y = augmenter(x)
     >>> list(map(lambda y: " ".join(y), y))
-    ['like I Hey', 'Keras and Tensorflow']
+    ['Hey I like', 'Keras Tensorflow and']
 
     Usage with skip_fn.
     >>> def skip_fn(word):
@@ -90,7 +166,7 @@ class RandomSwap(PreprocessingLayer):
     ...     skip_fn=skip_fn, seed=11)
     >>> y = augmenter(x)
     >>> list(map(lambda y: " ".join(y), y))
-    ['like I Hey', 'Keras and Tensorflow']
+    ['like I Hey', 'Tensorflow and Keras']
 
     Usage with skip_py_fn.
     >>> def skip_py_fn(word):
@@ -112,7 +188,9 @@ class RandomSwap(PreprocessingLayer):
         skip_list=None,
         skip_fn=None,
         skip_py_fn=None,
+        skip_fn_vectorized=False,
         seed=None,
+        jit_compile=False,
         name=None,
         dtype="int32",
         **kwargs,
@@ -129,9 +207,16 @@ class RandomSwap(PreprocessingLayer):
         self.max_swaps = max_swaps
         self.seed = random.randint(1, int(1e9)) if seed is None else seed
         self._generator = tf.random.Generator.from_seed(self.seed)
+        self.jit_compile = jit_compile
+        self._swap_indices = (
+            _swap_indices_xla_fn if jit_compile else _swap_indices_fn
+        )
         self.skip_list = skip_list
         self.skip_fn = skip_fn
         self.skip_py_fn = skip_py_fn
+        self.skip_fn_vectorized = skip_fn_vectorized
+        # How to map a scalar `skip_fn`, decided on first call.
+        self._skip_fn_mode = None
         if self.max_swaps is not None and self.max_swaps < 0:
             raise ValueError(
                 "max_swaps must be non-negative."
@@ -144,97 +229,195 @@ class RandomSwap(PreprocessingLayer):
                 "provided."
             )
 
+        self._skip_lut = None
         if self.skip_list:
+            skip_keys = tf.convert_to_tensor(self.skip_list)
+            skip_values = tf.ones_like(skip_keys, "bool")
+            if skip_keys.dtype.is_integer:
+                # Integer hash tables only have int64 key and value kernels.
+                skip_keys = tf.cast(skip_keys, "int64")
+                skip_values = tf.cast(skip_values, "int64")
+                # Small, non-negative integer skip lists are looked up with a
+                # dense boolean table, which avoids hashing every token.
+                if min(self.skip_list) >= 0 and max(self.skip_list) < 2**20:
+                    skip_lut = np.zeros(max(self.skip_list) + 1, "bool")
+                    skip_lut[self.skip_list] = True
+                    self._skip_lut = tf.constant(skip_lut)
             self.StaticHashTable = tf.lookup.StaticHashTable(
-                tf.lookup.KeyValueTensorInitializer(
-                    tf.convert_to_tensor(self.skip_list),
-                    tf.convert_to_tensor([True] * len(self.skip_list)),
-                ),
-                default_value=False,
+                tf.lookup.KeyValueTensorInitializer(skip_keys, skip_values),
+                default_value=tf.zeros([], skip_values.dtype),
             )
 
     @preprocessing_function
-    def call(self, inputs):
+    def call(self, inputs, seed=None):
         inputs, unbatched, rectangular = convert_to_ragged_batch(inputs)
+        # Candidates are indexed on the flat values with one row id each,
+        # which only holds for a batch of rank 1 token sequences.
+        if inputs.shape.rank != 2 or inputs.ragged_rank != 1:
+            raise ValueError(
+                "Input must be a rank 1 (unbatched) or rank 2 (batched) "
+                f"sequence of tokens. Received: inputs.shape={inputs.shape}"
+            )
+        # All index math below is int64, whatever the input row splits are.
+        row_splits_dtype = inputs.row_splits.dtype
+        inputs = inputs.with_row_splits_dtype("int64")
 
         skip_masks = None
         if self.skip_list:
-            skip_masks = self.StaticHashTable.lookup(inputs.flat_values)
+            tokens = inputs.flat_values
+            if tokens.dtype.is_integer:
+                tokens = tf.cast(tokens, "int64")
+            if self._skip_lut is not None and tokens.dtype.is_integer:
+                skip_masks = self._lookup_skip_lut(tokens)
+            else:
+                skip_masks = self.StaticHashTable.lookup(tokens)
+                skip_masks = tf.cast(skip_masks, "bool")
         elif self.skip_fn:
-            skip_masks = tf.map_fn(
-                self.skip_fn, inputs.flat_values, fn_output_signature="bool"
-            )
+            skip_masks = self._skip_fn_masks(inputs.flat_values)
         elif self.skip_py_fn:
 
-            def string_fn(token):
-                return self.skip_py_fn(token.numpy().decode("utf-8"))
+            def string_fn(tokens):
+                tokens = [t.decode("utf-8") for t in tokens.numpy()]
+                return np.array([self.skip_py_fn(t) for t in tokens], "bool")
 
-            def int_fn(token):
-                return self.skip_py_fn(token.numpy())
+            def int_fn(tokens):
+                tokens = tokens.numpy()
+                return np.array([self.skip_py_fn(t) for t in tokens], "bool")
 
             py_fn = string_fn if inputs.dtype == tf.string else int_fn
 
-            skip_masks = tf.map_fn(
-                lambda x: tf.py_function(py_fn, [x], "bool"),
-                inputs.flat_values,
-                fn_output_signature="bool",
-            )
-
-        positions = tf.ragged.range(inputs.row_lengths())
+            # Cross into python once for all tokens, not once per token, and
+            # call `skip_py_fn` only once for every distinct token.
+            unique_tokens, unique_indices = tf.unique(inputs.flat_values)
+            skip_masks = tf.py_function(py_fn, [unique_tokens], "bool")
+            skip_masks = tf.gather(skip_masks, unique_indices)
 
+        # Flat indices of the candidate tokens, grouped by row.
+        positions = tf.range(tf.size(inputs.flat_values, out_type=tf.int64))
+        row_ids = inputs.value_rowids()
         if skip_masks is not None:
             skip_masks = tf.logical_not(skip_masks)
             skip_masks.set_shape([None])
-            positions = tf.ragged.boolean_mask(
-                positions, inputs.with_flat_values(skip_masks)
-            )
+            positions = tf.boolean_mask(positions, skip_masks)
+            row_ids = tf.boolean_mask(row_ids, skip_masks)
+        # Count candidates per row with segment reductions over the flat
+        # values rather than building a ragged tensor of positions.
+        num_candidates = tf.math.unsorted_segment_sum(
+            tf.ones_like(row_ids), row_ids, inputs.nrows()
+        )
+        candidate_starts = tf.math.cumsum(num_candidates, exclusive=True)
+        # Draw one base seed per call with a single stateful op, unless one is
+        # passed in, and derive the seeds for all sampling below from it
+        # statelessly.
+        if seed is None:
+            seed = self._generator.make_seeds(1)[:, 0]
+        else:
+            seed = tf.cast(seed, tf.int64)
+        seeds = tf.random.experimental.stateless_split(seed, num=2)
         # Figure out how many we are going to select.
-        token_counts = tf.cast(positions.row_lengths(), "float32")
+        token_counts = tf.cast(num_candidates, "float32")
         num_to_select = tf.random.stateless_binomial(
             shape=tf.shape(token_counts),
-            seed=self._generator.make_seeds()[:, 0],
+            seed=seeds[0],
             counts=token_counts,
             probs=self.rate,
         )
         if self.max_swaps is not None:
             num_to_select = tf.math.minimum(num_to_select, self.max_swaps)
+        # Every swap consumes a disjoint pair of candidate positions.
         num_to_select = tf.math.minimum(
-            num_to_select, tf.cast(positions.row_lengths(), "int32")
+            num_to_select, tf.cast(num_candidates // 2, "int32")
         )
         num_to_select = tf.cast(num_to_select, "int64")
 
-        def _swap(x):
-            positions, inputs, num_to_select = x
-            for _ in range(num_to_select):
-                index = tf.random.stateless_uniform(
-                    shape=[2],
-                    minval=0,
-                    maxval=tf.size(positions),
-                    dtype="int32",
-                    seed=self._generator.make_seeds()[:, 0],
-                )
-                index1, index2 = positions[index[0]], positions[index[1]]
-                # swap items at the sampled indices with each other
-                inputs = tf.tensor_scatter_nd_update(
-                    inputs,
-                    [[index1], [index2]],
-                    [inputs[index2], inputs[index1]],
-                )
-            return inputs
-
-        swapped = tf.map_fn(
-            _swap,
-            (positions, inputs, num_to_select),
-            fn_output_signature=tf.RaggedTensorSpec(
-                ragged_rank=positions.ragged_rank - 1, dtype=inputs.dtype
-            ),
+        def swap_tokens():
+            # Pair up randomly shuffled candidates within each row, apply the
+            # swaps to an index permutation, and move the tokens with a single
+            # gather so the (possibly long string) tokens are copied once.
+            destinations, sources = self._swap_indices(
+                positions,
+                row_ids,
+                tf.gather(candidate_starts, row_ids),
+                num_to_select,
+                seeds[1],
+            )
+            permutation = tf.tensor_scatter_nd_update(
+                tf.range(tf.size(inputs.flat_values, out_type=tf.int64)),
+                destinations[:, None],
+                sources,
+            )
+            return tf.gather(inputs.flat_values, permutation)
+
+        # Skip the swap entirely when no row samples a single swap, which is
+        # the common case for a low `rate` and short sequences.
+        flat_values = tf.cond(
+            tf.reduce_any(num_to_select > 0),
+            swap_tokens,
+            lambda: inputs.flat_values,
         )
+        swapped = inputs.with_flat_values(flat_values)
+        swapped = swapped.with_row_splits_dtype(row_splits_dtype)
         swapped.flat_values.set_shape([None])
 
         if unbatched:
             swapped = tf.squeeze(swapped, axis=0)
         return swapped
 
+    def _lookup_skip_lut(self, tokens):
+        """Look up int64 tokens in the dense `skip_list` table."""
+        lut_size = tf.size(self._skip_lut, out_type=tf.int64)
+        in_range = (tokens >= 0) & (tokens < lut_size)
+        indices = tf.clip_by_value(tokens, 0, lut_size - 1)
+        return tf.gather(self._skip_lut, indices) & in_range
+
+    def _skip_fn_masks(self, tokens):
+        """Apply `skip_fn` to a rank 1 tensor of tokens.
+
+        Unless `skip_fn_vectorized` is set, `skip_fn` is a scalar function.
+        It is vectorized with `tf.vectorized_map` if all of its ops can be
+        converted, and mapped with `tf.map_fn` otherwise. The choice is
+        remembered for later calls.
+        """
+        if not self.skip_fn_vectorized:
+            if self._skip_fn_mode != "map_fn":
+                try:
+                    # Without the while loop fallback, unsupported ops fail
+                    # while tracing instead of at runtime.
+                    skip_masks = tf.vectorized_map(
+                        self.skip_fn, tokens, fallback_to_while_loop=False
+                    )
+                    self._skip_fn_mode = "vectorized_map"
+                    return skip_masks
+                except (TypeError, ValueError):
+                    self._skip_fn_mode = "map_fn"
+            return tf.map_fn(self.skip_fn, tokens, fn_output_signature="bool")
+
+        skip_masks = tf.convert_to_tensor(self.skip_fn(tokens))
+        if (
+            skip_masks.dtype != tf.bool
+            or not skip_masks.shape.is_compatible_with(tokens.shape)
+        ):
+            raise ValueError(
+                "With `skip_fn_vectorized=True`, `skip_fn` must return a "
+                "boolean tensor with the same shape as its input. "
+                f"Received: input shape={tokens.shape}, output "
+                f"shape={skip_masks.shape}, output dtype={skip_masks.dtype}."
+            )
+        # Shapes are only known at runtime when tracing, check them there.
+        with tf.control_dependencies(
+            [
+                tf.debugging.assert_equal(
+                    tf.shape(skip_masks),
+                    tf.shape(tokens),
+                    message=(
+                        "With `skip_fn_vectorized=True`, `skip_fn` must "
+                        "return a tensor with the same shape as its input."
+                    ),
+                )
+            ]
+        ):
+            return tf.identity(skip_masks)
+
     def get_config(self):
         config = super().get_config()
         config.update(
@@ -242,9 +425,11 @@ class RandomSwap(PreprocessingLayer):
                 "rate": self.rate,
                 "max_swaps": self.max_swaps,
                 "seed": self.seed,
+                "jit_compile": self.jit_compile,
                 "skip_list": self.skip_list,
                 "skip_fn": self.skip_fn,
                 "skip_py_fn": self.skip_py_fn,
+                "skip_fn_vectorized": self.skip_fn_vectorized,
             }
         )
         return config
@@ -15,7 +15,7 @@ class RandomSwapTest(TestCase):
         output = [
             tf.strings.reduce_join(x, separator=" ", axis=-1) for x in augmented
         ]
-        exp_output = ["like I Hey", "Tensorflow Keras and"]
+        exp_output = ["like I Hey", "Keras Tensorflow and"]
         self.assertAllEqual(output, exp_output)
 
     def test_shape_and_output_from_character_swap(self):
@@ -25,7 +25,7 @@ class RandomSwapTest(TestCase):
         augmenter = RandomSwap(rate=0.7, max_swaps=6, seed=42)
         augmented = augmenter(split)
         output = [tf.strings.reduce_join(x, axis=-1) for x in augmented]
-        exp_output = ["yli I eHke", "seaad rnK Tensolrfow"]
+        exp_output = [" i HeykelI", "eer srdoaaTKnsn flwo"]
         self.assertAllEqual(output, exp_output)
 
     def test_with_integer_tokens(self):
@@ -33,9 +33,39 @@ class RandomSwapTest(TestCase):
         inputs = tf.constant([[1, 2, 3], [4, 5, 6]])
         augmenter = RandomSwap(rate=0.7, max_swaps=6, seed=42)
         output = augmenter(inputs)
-        exp_output = [[3, 2, 1], [6, 4, 5]]
+        exp_output = [[3, 2, 1], [4, 6, 5]]
         self.assertAllEqual(output, exp_output)
 
+    def test_no_swaps(self):
+        inputs = tf.strings.split(["Hey I like", "Keras and Tensorflow"])
+        for augmenter in (
+            RandomSwap(rate=0.0, seed=42),
+            RandomSwap(rate=0.9, max_swaps=0, seed=42),
+        ):
+            self.assertAllEqual(augmenter(inputs), inputs)
+
+    def test_int32_row_splits(self):
+        inputs = tf.RaggedTensor.from_row_splits(
+            tf.constant([1, 2, 3, 4, 5]), tf.constant([0, 2, 5], "int32")
+        )
+        augmenter = RandomSwap(rate=0.9, seed=42)
+        output = augmenter(inputs, seed=[1, 2])
+        int64_output = augmenter(
+            inputs.with_row_splits_dtype("int64"), seed=[1, 2]
+        )
+        self.assertAllEqual(output, int64_output)
+        self.assertAllEqual(sorted(output[1]), [3, 4, 5])
+
+        output = tf.function(augmenter)(inputs)
+        self.assertEqual(output.row_splits.dtype, tf.int32)
+
+    def test_invalid_input_rank(self):
+        augmenter = RandomSwap(rate=0.9, seed=42)
+        with self.assertRaises(ValueError):
+            augmenter(tf.ragged.constant([[[1, 2], [3]], [[4, 5, 6]]]))
+        with self.assertRaises(ValueError):
+            augmenter(tf.ones((2, 3, 4), "int32"))
+
     def test_skip_options(self):
         keras.utils.set_random_seed(1337)
         augmenter = RandomSwap(
@@ -45,7 +75,7 @@ class RandomSwapTest(TestCase):
         split = tf.strings.split(inputs)
         augmented = augmenter(split)
         output = tf.strings.reduce_join(augmented, separator=" ", axis=-1)
-        exp_output = ["I Hey like", "Keras and Tensorflow"]
+        exp_output = ["I Hey like", "and Keras Tensorflow"]
         self.assertAllEqual(output, exp_output)
 
         def skip_fn(word):
@@ -56,7 +86,7 @@ class RandomSwapTest(TestCase):
         augmenter = RandomSwap(rate=0.9, max_swaps=3, seed=11, skip_fn=skip_fn)
         augmented = augmenter(split)
         output = tf.strings.reduce_join(augmented, separator=" ", axis=-1)
-        exp_output = ["I Hey like", "Keras and Tensorflow"]
+        exp_output = ["I Hey like", "and Keras Tensorflow"]
         self.assertAllEqual(output, exp_output)
 
         def skip_py_fn(word):
@@ -69,7 +99,143 @@ class RandomSwapTest(TestCase):
         )
         augmented = augmenter(split)
         output = tf.strings.reduce_join(augmented, separator=" ", axis=-1)
-        exp_output = ["I Hey like", "Keras and Tensorflow"]
+        exp_output = ["I Hey like", "and Keras Tensorflow"]
+        self.assertAllEqual(output, exp_output)
+
+    def test_skip_list_with_integer_tokens(self):
+        keras.utils.set_random_seed(1337)
+        inputs = tf.constant([[1, 2, 3, 4], [5, 6, 7, 2000000]])
+        # Small skip lists use a dense lookup table, large ones a hash table.
+        for skip_list in ([1, 7], [1, 7, 2000000]):
+            augmenter = RandomSwap(
+                rate=0.9, max_swaps=2, seed=42, skip_list=skip_list
+            )
+            output = augmenter(inputs)
+            self.assertEqual(output[0][0], 1)
+            self.assertEqual(output[1][2], 7)
+            self.assertAllEqual(sorted(output[0]), [1, 2, 3, 4])
+            self.assertAllEqual(sorted(output[1]), [5, 6, 7, 2000000])
+
+    def test_vectorized_skip_fn(self):
+        num_calls = []
+
+        def skip_fn(words):
+            num_calls.append(words.shape.rank)
+            return tf.strings.regex_full_match(words, r"[I, a].*")
+
+        augmenter = RandomSwap(
+            rate=0.9,
+            max_swaps=3,
+            seed=11,
+            skip_fn=skip_fn,
+            skip_fn_vectorized=True,
+        )
+        split = tf.strings.split(["Hey I like", "Keras and Tensorflow"])
+        augmented = augmenter(split)
+        # The predicate is applied to all tokens in a single call.
+        self.assertEqual(num_calls, [1])
+        self.assertEqual(augmented[0][1], "I")
+        self.assertEqual(augmented[1][1], "and")
+
+    def test_scalar_skip_fn(self):
+        def skip_fn(word):
+            return tf.cond(word == "I", lambda: True, lambda: False)
+
+        augmenter = RandomSwap(rate=0.9, max_swaps=3, seed=11, skip_fn=skip_fn)
+        split = tf.strings.split(["Hey I like", "Keras and Tensorflow"])
+        augmented = augmenter(split)
+        self.assertEqual(augmenter._skip_fn_mode, "vectorized_map")
+        self.assertEqual(augmented[0][1], "I")
+
+    def test_indexing_scalar_skip_fn(self):
+        def skip_fn(word):
+            return tf.strings.bytes_split(word)[0] == "K"
+
+        # In the second batch the first word has as many characters as there
+        # are tokens, so calling `skip_fn` on all tokens at once would return
+        # a wrong mask of the right shape.
+        for inputs in (
+            ["Hey I like", "Keras and Tensorflow"],
+            ["Heyyyy I like", "Keras and Tensorflow"],
+        ):
+            split = tf.strings.split(inputs)
+            augmenter = RandomSwap(rate=0.9, seed=11, skip_fn=skip_fn)
+            for seed in range(5):
+                augmented = augmenter(split, seed=[seed, 0])
+                self.assertEqual(augmented[1][0], "Keras")
+
+    def test_vectorized_skip_fn_shape_mismatch(self):
+        def skip_fn(words):
+            return tf.strings.bytes_split(words)[0] == "K"
+
+        augmenter = RandomSwap(
+            rate=0.9, seed=11, skip_fn=skip_fn, skip_fn_vectorized=True
+        )
+        split = tf.strings.split(["Hey I like", "Keras and Tensorflow"])
+        with self.assertRaises(ValueError):
+            augmenter(split)
+
+    def test_vectorized_skip_fn_shape_mismatch_in_graph(self):
+        def skip_fn(words):
+            return tf.strings.bytes_split(words)[0] == "K"
+
+        augmenter = RandomSwap(
+            rate=0.9, seed=11, skip_fn=skip_fn, skip_fn_vectorized=True
+        )
+        split = tf.strings.split(["Hey I like", "Keras and Tensorflow"])
+        ds = tf.data.Dataset.from_tensor_slices(split).batch(2).map(augmenter)
+        with self.assertRaises(tf.errors.InvalidArgumentError):
+            ds.take(1).get_single_element()
+
+    def test_skip_py_fn_called_once_per_unique_token(self):
+        words = []
+
+        def skip_py_fn(word):
+            words.append(word)
+            return word == "a"
+
+        augmenter = RandomSwap(rate=0.9, seed=11, skip_py_fn=skip_py_fn)
+        split = tf.strings.split(["a b a b", "b a c"])
+        augmented = augmenter(split)
+        self.assertEqual(sorted(words), ["a", "b", "c"])
+        self.assertAllEqual(augmented[0][0], "a")
+        self.assertAllEqual(augmented[0][2], "a")
+        self.assertAllEqual(augmented[1][1], "a")
+
+    def test_jit_compile(self):
+        inputs = tf.strings.split(["Hey I like", "Keras and Tensorflow"])
+        augmenter = RandomSwap(rate=0.7, max_swaps=3, seed=42)
+        jit_augmenter = RandomSwap(
+            rate=0.7, max_swaps=3, seed=42, jit_compile=True
+        )
+        self.assertAllEqual(augmenter(inputs), jit_augmenter(inputs))
+
+    def test_call_seed(self):
+        inputs = tf.strings.split(["Hey I like", "Keras and Tensorflow"])
+        augmenter = RandomSwap(rate=0.7, max_swaps=3, seed=42)
+        output = augmenter(inputs, seed=[1, 2])
+        # The result only depends on the passed seed, not the layer state.
+        augmenter(inputs)
+        self.assertAllEqual(augmenter(inputs, seed=[1, 2]), output)
+        other_augmenter = RandomSwap(rate=0.7, max_swaps=3, seed=7)
+        self.assertAllEqual(other_augmenter(inputs, seed=[1, 2]), output)
+
+    def test_call_seed_with_parallel_map(self):
+        split = tf.strings.split(["Hey I like", "Keras and Tensorflow"])
+        augmenter = RandomSwap(rate=0.7, max_swaps=3, seed=42)
+        seeds = tf.data.Dataset.random(seed=4).batch(2)
+        ds = tf.data.Dataset.zip(
+            (tf.data.Dataset.from_tensor_slices(split), seeds)
+        )
+        ds = ds.map(
+            lambda x, seed: augmenter(x, seed=seed),
+            num_parallel_calls=tf.data.AUTOTUNE,
+        )
+        ds = ds.apply(tf.data.experimental.dense_to_ragged_batch(2))
+        output = ds.take(1).get_single_element()
+        exp_output = [
+            augmenter(x, seed=seed) for x, seed in zip(split, seeds.take(2))
+        ]
         self.assertAllEqual(output, exp_output)
 
     def test_get_config_and_from_config(self):
@@ -101,7 +267,7 @@ class RandomSwapTest(TestCase):
         output = ds.take(1).get_single_element()
         exp_output = [
             ["like", "I", "Hey"],
-            ["and", "Tensorflow", "Keras"],
+            ["Keras", "Tensorflow", "and"],
         ]
         self.assertAllEqual(output, exp_output)
 
@@ -118,8 +284,8 @@ class RandomSwapTest(TestCase):
         ds = ds.apply(tf.data.experimental.dense_to_ragged_batch(2))
         output = ds.take(1).get_single_element()
         exp_output = [
-            ["like", "I", "Hey"],
-            ["Keras", "and", "Tensorflow"],
+            ["Hey", "I", "like"],
+            ["Tensorflow", "and", "Keras"],
         ]
         self.assertAllEqual(output, exp_output)
 
@@ -131,8 +297,8 @@ class RandomSwapTest(TestCase):
         ds = ds.apply(tf.data.experimental.dense_to_ragged_batch(2))
         output = ds.take(1).get_single_element()
         exp_output = [
-            ["Hey", "I", "like"],
-            ["Tensorflow", "Keras", "and"],
+            ["like", "I", "Hey"],
+            ["Keras", "Tensorflow", "and"],
         ]
         self.assertAllEqual(output, exp_output)
 
@@ -146,7 +312,7 @@ class RandomSwapTest(TestCase):
         output = ds.take(1).get_single_element()
         exp_output = [
             ["like", "I", "Hey"],
-            ["Tensorflow", "Keras", "and"],
+            ["Keras", "Tensorflow", "and"],
         ]
         self.assertAllEqual(output, exp_output)
 
@@ -162,8 +328,8 @@ class RandomSwapTest(TestCase):
         ds = ds.batch(2).map(augmenter)
         output = ds.take(1).get_single_element()
         exp_output = [
-            ["Hey", "I", "like"],
-            ["and", "Keras", "Tensorflow"],
+            ["like", "I", "Hey"],
+            ["Tensorflow", "and", "Keras"],
         ]
         self.assertAllEqual(output, exp_output)
 
@@ -174,7 +340,7 @@ class RandomSwapTest(TestCase):
         ds = ds.batch(2).map(augmenter)
         output = ds.take(1).get_single_element()
         exp_output = [
-            ["Hey", "I", "like"],
-            ["and", "Keras", "Tensorflow"],
+            ["like", "I", "Hey"],
+            ["Tensorflow", "and", "Keras"],
         ]
         self.assertAllEqual(output, exp_output)
@@ -93,7 +93,7 @@ class CSPNetBackbone(FeaturePyramidBackbone):
         stackwise_depth=[1, 2, 4],
         stackwise_strides=[1, 2, 2],
         stackwise_num_filters=[32, 64, 128],
-        block_type="dark,
+        block_type="dark_block",
     )
     model(input_data)
     ```
@@ -136,14 +136,16 @@ class CSPNetBackbone(FeaturePyramidBackbone):
                 f"Received block_type={block_type}."
             )
 
+        if stage_type is None:
+            stage_type = "cs3"
         if stage_type not in (
             "dark",
             "csp",
             "cs3",
         ):
             raise ValueError(
-                '`block_type` must be either `"dark"`, `"csp"`, or `"cs3"`.'
-                f"Received block_type={stage_type}."
+                '`stage_type` must be either `"dark"`, `"csp"`, or `"cs3"`.'
+                f"Received stage_type={stage_type}."
             )
         data_format = standardize_data_format(data_format)
         channel_axis = -1 if data_format == "channels_last" else 1
@@ -673,6 +675,7 @@ def cross_stage(
                     kernel_size=3,
                     strides=strides,
                     dilation_rate=first_dilation,
+                    padding="valid" if strides > 1 else "same",
                     use_bias=False,
                     groups=groups,
                     data_format=data_format,
@@ -889,6 +892,7 @@ def cross_stage3(
                     kernel_size=3,
                     strides=strides,
                     dilation_rate=first_dilation,
+                    padding="valid" if strides > 1 else "same",
                     use_bias=False,
                     groups=groups,
                     data_format=data_format,
@@ -1076,6 +1080,7 @@ def dark_stage(
                 kernel_size=3,
                 strides=strides,
                 dilation_rate=first_dilation,
+                padding="valid" if strides > 1 else "same",
                 use_bias=False,
                 groups=groups,
                 data_format=data_format,
@@ -1256,17 +1261,18 @@ def create_csp_stages(
     stages = inputs
     pyramid_outputs = {}
     for stage_idx, _ in enumerate(stackwise_depth):
-        if net_strides >= output_strides and strides[stage_idx] > 1:
-            dilation *= strides[stage_idx]
-            strides = 1
-        net_strides *= strides[stage_idx]
+        stage_strides = strides[stage_idx]
+        if net_strides >= output_strides and stage_strides > 1:
+            dilation *= stage_strides
+            stage_strides = 1
+        net_strides *= stage_strides
         first_dilation = 1 if dilation in (1, 2) else 2
         stages = stage_fn(
             data_format=data_format,
             channel_axis=channel_axis,
             filters=filters[stage_idx],
             depth=stackwise_depth[stage_idx],
-            strides=strides[stage_idx],
+            strides=stage_strides,
             dilation=dilation,
             block_ratio=block_ratio[stage_idx],
             bottle_ratio=bottle_ratio[stage_idx],
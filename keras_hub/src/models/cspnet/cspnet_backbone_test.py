@@ -44,6 +44,21 @@ class CSPNetBackboneTest(TestCase):
             expected_pyramid_image_sizes=[(32, 32), (16, 16), (8, 8)],
         )
 
+    @parameterized.named_parameters(
+        ("csp", "csp", 48),
+        ("cs3", None, 24),
+    )
+    def test_output_strides(self, stage_type, num_filters):
+        model = CSPNetBackbone(
+            **{
+                **self.init_kwargs,
+                "stage_type": stage_type,
+                "output_strides": 4,
+            }
+        )
+        output = model(self.input_data)
+        self.assertEqual(ops.shape(output), (2, 16, 16, num_filters))
+
     @pytest.mark.large
     def test_saved_model(self):
         self.run_model_saving_test(
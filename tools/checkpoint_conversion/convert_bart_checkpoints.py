@@ -1,12 +1,19 @@
+import contextlib
+import functools
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 
+import keras
 import numpy as np
-import tensorflow as tf
+import torch
 import transformers
 from absl import app
 from absl import flags
 from checkpoint_conversion_utils import get_md5_checksum
+from huggingface_hub import hf_hub_download
+from huggingface_hub.utils import EntryNotFoundError
+from safetensors import safe_open
 
 import keras_hub
 
@@ -22,346 +29,288 @@ flags.DEFINE_string(
 )
 
 
-def convert_checkpoints(hf_model):
-    print("\n-> Convert original weights to KerasHub format.")
+def _qkv_kernel(t, hidden_dim, num_heads):
+    return t.permute(1, 0).contiguous().view(hidden_dim, num_heads, -1)
 
-    print("\n-> Load KerasHub model.")
-    keras_hub_model = keras_hub.models.BartBackbone.from_preset(
-        FLAGS.preset, load_weights=False
-    )
 
-    hf_wts = hf_model.state_dict()
-    print("Original weights:")
-    print(list(hf_wts.keys()))
+def _qkv_bias(t, hidden_dim, num_heads):
+    return t.view(num_heads, -1)
 
-    hidden_dim = keras_hub_model.hidden_dim
-    num_heads = keras_hub_model.num_heads
 
-    # Token embedding weights shared by encoder and decoder.
-    keras_hub_model.get_layer("token_embedding").embeddings.assign(
-        hf_wts["shared.weight"]
-    )
+def _out_kernel(t, hidden_dim, num_heads):
+    return t.permute(1, 0).contiguous().view(num_heads, -1, hidden_dim)
 
-    # Encoder weights.
-    keras_hub_model.get_layer(
-        "encoder_position_embedding"
-    ).position_embeddings.assign(hf_wts["encoder.embed_positions.weight"][2:])
 
-    keras_hub_model.get_layer("encoder_embeddings_layer_norm").gamma.assign(
-        hf_wts["encoder.layer_norm_embedding.weight"]
-    )
-    keras_hub_model.get_layer("encoder_embeddings_layer_norm").beta.assign(
-        hf_wts["encoder.layer_norm_embedding.bias"]
-    )
+def _transpose2d(t, hidden_dim, num_heads):
+    return t.permute(1, 0).contiguous()
 
-    for i in range(keras_hub_model.num_layers):
-        # Self-attention.
-        keras_hub_model.get_layer(
-            f"transformer_encoder_layer_{i}"
-        )._self_attention_layer._query_dense.kernel.assign(
-            hf_wts[f"encoder.layers.{i}.self_attn.q_proj.weight"]
-            .transpose(1, 0)
-            .reshape((hidden_dim, num_heads, -1))
-            .numpy()
-        )
-        keras_hub_model.get_layer(
-            f"transformer_encoder_layer_{i}"
-        )._self_attention_layer._query_dense.bias.assign(
-            hf_wts[f"encoder.layers.{i}.self_attn.q_proj.bias"]
-            .reshape((num_heads, -1))
-            .numpy()
-        )
 
-        keras_hub_model.get_layer(
-            f"transformer_encoder_layer_{i}"
-        )._self_attention_layer._key_dense.kernel.assign(
-            hf_wts[f"encoder.layers.{i}.self_attn.k_proj.weight"]
-            .transpose(1, 0)
-            .reshape((hidden_dim, num_heads, -1))
-            .numpy()
-        )
-        keras_hub_model.get_layer(
-            f"transformer_encoder_layer_{i}"
-        )._self_attention_layer._key_dense.bias.assign(
-            hf_wts[f"encoder.layers.{i}.self_attn.k_proj.bias"]
-            .reshape((num_heads, -1))
-            .numpy()
-        )
+def _passthrough(t, hidden_dim, num_heads):
+    return t
 
-        keras_hub_model.get_layer(
-            f"transformer_encoder_layer_{i}"
-        )._self_attention_layer._value_dense.kernel.assign(
-            hf_wts[f"encoder.layers.{i}.self_attn.v_proj.weight"]
-            .transpose(1, 0)
-            .reshape((hidden_dim, num_heads, -1))
-            .numpy()
-        )
-        keras_hub_model.get_layer(
-            f"transformer_encoder_layer_{i}"
-        )._self_attention_layer._value_dense.bias.assign(
-            hf_wts[f"encoder.layers.{i}.self_attn.v_proj.bias"]
-            .reshape((num_heads, -1))
-            .numpy()
-        )
 
-        keras_hub_model.get_layer(
-            f"transformer_encoder_layer_{i}"
-        )._self_attention_layer._output_dense.kernel.assign(
-            hf_wts[f"encoder.layers.{i}.self_attn.out_proj.weight"]
-            .transpose(1, 0)
-            .reshape((num_heads, -1, hidden_dim))
-            .numpy()
-        )
-        keras_hub_model.get_layer(
-            f"transformer_encoder_layer_{i}"
-        )._self_attention_layer._output_dense.bias.assign(
-            hf_wts[f"encoder.layers.{i}.self_attn.out_proj.bias"].numpy()
-        )
+# Maps a reshape kind to a function converting a HF tensor to the value of
+# the matching KerasHub variable. Each permute is materialized with a single
+# `contiguous()` copy, which `view()` then shares.
+RESHAPERS = {
+    "qkv_kernel": _qkv_kernel,
+    "qkv_bias": _qkv_bias,
+    "out_kernel": _out_kernel,
+    "transpose2d": _transpose2d,
+    "passthrough": _passthrough,
+}
 
-        keras_hub_model.get_layer(
-            f"transformer_encoder_layer_{i}"
-        )._self_attention_layer_norm.gamma.assign(
-            hf_wts[f"encoder.layers.{i}.self_attn_layer_norm.weight"].numpy()
-        )
-        keras_hub_model.get_layer(
-            f"transformer_encoder_layer_{i}"
-        )._self_attention_layer_norm.beta.assign(
-            hf_wts[f"encoder.layers.{i}.self_attn_layer_norm.bias"].numpy()
-        )
 
-        # Post self-attention layers.
-        keras_hub_model.get_layer(
-            f"transformer_encoder_layer_{i}"
-        )._feedforward_intermediate_dense.kernel.assign(
-            hf_wts[f"encoder.layers.{i}.fc1.weight"].transpose(1, 0).numpy()
-        )
-        keras_hub_model.get_layer(
-            f"transformer_encoder_layer_{i}"
-        )._feedforward_intermediate_dense.bias.assign(
-            hf_wts[f"encoder.layers.{i}.fc1.bias"].numpy()
-        )
+def _attention_spec(hf_name, keras_name):
+    spec = []
+    for hf_proj, keras_proj in (
+        ("q_proj", "_query_dense"),
+        ("k_proj", "_key_dense"),
+        ("v_proj", "_value_dense"),
+    ):
+        spec += [
+            (
+                f"{hf_name}.{hf_proj}.weight",
+                f"{keras_name}.{keras_proj}.kernel",
+                "qkv_kernel",
+            ),
+            (
+                f"{hf_name}.{hf_proj}.bias",
+                f"{keras_name}.{keras_proj}.bias",
+                "qkv_bias",
+            ),
+        ]
+    spec += [
+        (
+            f"{hf_name}.out_proj.weight",
+            f"{keras_name}._output_dense.kernel",
+            "out_kernel",
+        ),
+        (
+            f"{hf_name}.out_proj.bias",
+            f"{keras_name}._output_dense.bias",
+            "passthrough",
+        ),
+        (
+            f"{hf_name}_layer_norm.weight",
+            f"{keras_name}_norm.gamma",
+            "passthrough",
+        ),
+        (
+            f"{hf_name}_layer_norm.bias",
+            f"{keras_name}_norm.beta",
+            "passthrough",
+        ),
+    ]
+    return spec
+
+
+_FEEDFORWARD_SPEC = [
+    ("fc1.weight", "_feedforward_intermediate_dense.kernel", "transpose2d"),
+    ("fc1.bias", "_feedforward_intermediate_dense.bias", "passthrough"),
+    ("fc2.weight", "_feedforward_output_dense.kernel", "transpose2d"),
+    ("fc2.bias", "_feedforward_output_dense.bias", "passthrough"),
+    ("final_layer_norm.weight", "_feedforward_layer_norm.gamma", "passthrough"),
+    ("final_layer_norm.bias", "_feedforward_layer_norm.beta", "passthrough"),
+]
+
+# `(HF key suffix, KerasHub attribute path, reshape kind)` for the weights of
+# a single encoder or decoder layer.
+ENCODER_LAYER_SPEC = (
+    _attention_spec("self_attn", "_self_attention_layer") + _FEEDFORWARD_SPEC
+)
+DECODER_LAYER_SPEC = (
+    _attention_spec("self_attn", "_self_attention_layer")
+    + _attention_spec("encoder_attn", "_cross_attention_layer")
+    + _FEEDFORWARD_SPEC
+)
 
-        keras_hub_model.get_layer(
-            f"transformer_encoder_layer_{i}"
-        )._feedforward_output_dense.kernel.assign(
-            hf_wts[f"encoder.layers.{i}.fc2.weight"].transpose(1, 0).numpy()
-        )
-        keras_hub_model.get_layer(
-            f"transformer_encoder_layer_{i}"
-        )._feedforward_output_dense.bias.assign(
-            hf_wts[f"encoder.layers.{i}.fc2.bias"].numpy()
-        )
 
-        keras_hub_model.get_layer(
-            f"transformer_encoder_layer_{i}"
-        )._feedforward_layer_norm.gamma.assign(
-            hf_wts[f"encoder.layers.{i}.final_layer_norm.weight"].numpy()
-        )
-        keras_hub_model.get_layer(
-            f"transformer_encoder_layer_{i}"
-        )._feedforward_layer_norm.beta.assign(
-            hf_wts[f"encoder.layers.{i}.final_layer_norm.bias"].numpy()
-        )
+# The shared token embedding is tied, so checkpoints may store it under any of
+# these names.
+KEY_ALIASES = {
+    "shared.weight": [
+        "encoder.embed_tokens.weight",
+        "decoder.embed_tokens.weight",
+    ],
+}
 
-    # Decoder weights.
 
-    keras_hub_model.get_layer(
-        "decoder_position_embedding"
-    ).position_embeddings.assign(hf_wts["decoder.embed_positions.weight"][2:])
+class _LazyDict:
+    """Read-only mapping that loads memory mapped HF weights on access.
 
-    keras_hub_model.get_layer("decoder_embeddings_layer_norm").gamma.assign(
-        hf_wts["decoder.layer_norm_embedding.weight"]
-    )
-    keras_hub_model.get_layer("decoder_embeddings_layer_norm").beta.assign(
-        hf_wts["decoder.layer_norm_embedding.bias"]
-    )
+    Tensors are read one at a time, so the full model is never materialized.
+    Keys are looked up with and without the `"model."` prefix used by the
+    `BartFor*` checkpoints.
+    """
 
-    for i in range(keras_hub_model.num_layers):
-        # Self-attention.
-        keras_hub_model.get_layer(
-            f"transformer_decoder_layer_{i}"
-        )._self_attention_layer._query_dense.kernel.assign(
-            hf_wts[f"decoder.layers.{i}.self_attn.q_proj.weight"]
-            .transpose(1, 0)
-            .reshape((hidden_dim, num_heads, -1))
-            .numpy()
-        )
-        keras_hub_model.get_layer(
-            f"transformer_decoder_layer_{i}"
-        )._self_attention_layer._query_dense.bias.assign(
-            hf_wts[f"decoder.layers.{i}.self_attn.q_proj.bias"]
-            .reshape((num_heads, -1))
-            .numpy()
-        )
+    def __init__(self, keys, get_tensor):
+        self._keys = set(keys)
+        self._get_tensor = get_tensor
 
-        keras_hub_model.get_layer(
-            f"transformer_decoder_layer_{i}"
-        )._self_attention_layer._key_dense.kernel.assign(
-            hf_wts[f"decoder.layers.{i}.self_attn.k_proj.weight"]
-            .transpose(1, 0)
-            .reshape((hidden_dim, num_heads, -1))
-            .numpy()
-        )
-        keras_hub_model.get_layer(
-            f"transformer_decoder_layer_{i}"
-        )._self_attention_layer._key_dense.bias.assign(
-            hf_wts[f"decoder.layers.{i}.self_attn.k_proj.bias"]
-            .reshape((num_heads, -1))
-            .numpy()
-        )
+    def _find(self, key):
+        for name in [key] + KEY_ALIASES.get(key, []):
+            for candidate in (name, f"model.{name}"):
+                if candidate in self._keys:
+                    return candidate
+        raise KeyError(key)
 
-        keras_hub_model.get_layer(
-            f"transformer_decoder_layer_{i}"
-        )._self_attention_layer._value_dense.kernel.assign(
-            hf_wts[f"decoder.layers.{i}.self_attn.v_proj.weight"]
-            .transpose(1, 0)
-            .reshape((hidden_dim, num_heads, -1))
-            .numpy()
-        )
-        keras_hub_model.get_layer(
-            f"transformer_decoder_layer_{i}"
-        )._self_attention_layer._value_dense.bias.assign(
-            hf_wts[f"decoder.layers.{i}.self_attn.v_proj.bias"]
-            .reshape((num_heads, -1))
-            .numpy()
-        )
+    def __getitem__(self, key):
+        return self._get_tensor(self._find(key))
 
-        keras_hub_model.get_layer(
-            f"transformer_decoder_layer_{i}"
-        )._self_attention_layer._output_dense.kernel.assign(
-            hf_wts[f"decoder.layers.{i}.self_attn.out_proj.weight"]
-            .transpose(1, 0)
-            .reshape((num_heads, -1, hidden_dim))
-            .numpy()
-        )
-        keras_hub_model.get_layer(
-            f"transformer_decoder_layer_{i}"
-        )._self_attention_layer._output_dense.bias.assign(
-            hf_wts[f"decoder.layers.{i}.self_attn.out_proj.bias"].numpy()
-        )
+    def keys(self):
+        return self._keys
 
-        keras_hub_model.get_layer(
-            f"transformer_decoder_layer_{i}"
-        )._self_attention_layer_norm.gamma.assign(
-            hf_wts[f"decoder.layers.{i}.self_attn_layer_norm.weight"].numpy()
-        )
-        keras_hub_model.get_layer(
-            f"transformer_decoder_layer_{i}"
-        )._self_attention_layer_norm.beta.assign(
-            hf_wts[f"decoder.layers.{i}.self_attn_layer_norm.bias"].numpy()
-        )
 
-        # Cross-attention.
-        keras_hub_model.get_layer(
-            f"transformer_decoder_layer_{i}"
-        )._cross_attention_layer._query_dense.kernel.assign(
-            hf_wts[f"decoder.layers.{i}.encoder_attn.q_proj.weight"]
-            .transpose(1, 0)
-            .reshape((hidden_dim, num_heads, -1))
-            .numpy()
-        )
-        keras_hub_model.get_layer(
-            f"transformer_decoder_layer_{i}"
-        )._cross_attention_layer._query_dense.bias.assign(
-            hf_wts[f"decoder.layers.{i}.encoder_attn.q_proj.bias"]
-            .reshape((num_heads, -1))
-            .numpy()
-        )
+def load_hf_weights(hf_model_name):
+    try:
+        path = hf_hub_download(hf_model_name, "model.safetensors")
+    except EntryNotFoundError:
+        # Older checkpoints only ship a pickled state dict. `mmap` leaves the
+        # tensors on disk until the conversion touches them.
+        path = hf_hub_download(hf_model_name, "pytorch_model.bin")
+        state_dict = torch.load(path, mmap=True, weights_only=True)
+        return _LazyDict(state_dict.keys(), state_dict.__getitem__)
+    f = safe_open(path, framework="pt", device="cpu")
+    return _LazyDict(f.keys(), f.get_tensor)
 
-        keras_hub_model.get_layer(
-            f"transformer_decoder_layer_{i}"
-        )._cross_attention_layer._key_dense.kernel.assign(
-            hf_wts[f"decoder.layers.{i}.encoder_attn.k_proj.weight"]
-            .transpose(1, 0)
-            .reshape((hidden_dim, num_heads, -1))
-            .numpy()
-        )
-        keras_hub_model.get_layer(
-            f"transformer_decoder_layer_{i}"
-        )._cross_attention_layer._key_dense.bias.assign(
-            hf_wts[f"decoder.layers.{i}.encoder_attn.k_proj.bias"]
-            .reshape((num_heads, -1))
-            .numpy()
-        )
 
-        keras_hub_model.get_layer(
-            f"transformer_decoder_layer_{i}"
-        )._cross_attention_layer._value_dense.kernel.assign(
-            hf_wts[f"decoder.layers.{i}.encoder_attn.v_proj.weight"]
-            .transpose(1, 0)
-            .reshape((hidden_dim, num_heads, -1))
-            .numpy()
-        )
-        keras_hub_model.get_layer(
-            f"transformer_decoder_layer_{i}"
-        )._cross_attention_layer._value_dense.bias.assign(
-            hf_wts[f"decoder.layers.{i}.encoder_attn.v_proj.bias"]
-            .reshape((num_heads, -1))
-            .numpy()
-        )
+def _np(t):
+    """Return `t` as a NumPy array, copying only if it is not contiguous."""
+    return t.detach().contiguous().numpy()
 
-        keras_hub_model.get_layer(
-            f"transformer_decoder_layer_{i}"
-        )._cross_attention_layer._output_dense.kernel.assign(
-            hf_wts[f"decoder.layers.{i}.encoder_attn.out_proj.weight"]
-            .transpose(1, 0)
-            .reshape((num_heads, -1, hidden_dim))
-            .numpy()
-        )
-        keras_hub_model.get_layer(
-            f"transformer_decoder_layer_{i}"
-        )._cross_attention_layer._output_dense.bias.assign(
-            hf_wts[f"decoder.layers.{i}.encoder_attn.out_proj.bias"].numpy()
-        )
 
-        keras_hub_model.get_layer(
-            f"transformer_decoder_layer_{i}"
-        )._cross_attention_layer_norm.gamma.assign(
-            hf_wts[f"decoder.layers.{i}.encoder_attn_layer_norm.weight"].numpy()
-        )
-        keras_hub_model.get_layer(
-            f"transformer_decoder_layer_{i}"
-        )._cross_attention_layer_norm.beta.assign(
-            hf_wts[f"decoder.layers.{i}.encoder_attn_layer_norm.bias"].numpy()
-        )
+def _to_backend_tensor(t, variable):
+    """Convert a torch tensor for `variable.assign()` without a host copy."""
+    backend = keras.config.backend()
+    if backend == "torch":
+        return t.to(variable.value.device)
+    if backend == "jax":
+        import jax
 
-        # Post self-attention and cross-attention layers.
-        keras_hub_model.get_layer(
-            f"transformer_decoder_layer_{i}"
-        )._feedforward_intermediate_dense.kernel.assign(
-            hf_wts[f"decoder.layers.{i}.fc1.weight"].transpose(1, 0).numpy()
-        )
-        keras_hub_model.get_layer(
-            f"transformer_decoder_layer_{i}"
-        )._feedforward_intermediate_dense.bias.assign(
-            hf_wts[f"decoder.layers.{i}.fc1.bias"].numpy()
-        )
+        return jax.dlpack.from_dlpack(t)
+    import tensorflow as tf
 
-        keras_hub_model.get_layer(
-            f"transformer_decoder_layer_{i}"
-        )._feedforward_output_dense.kernel.assign(
-            hf_wts[f"decoder.layers.{i}.fc2.weight"].transpose(1, 0).numpy()
-        )
-        keras_hub_model.get_layer(
-            f"transformer_decoder_layer_{i}"
-        )._feedforward_output_dense.bias.assign(
-            hf_wts[f"decoder.layers.{i}.fc2.bias"].numpy()
-        )
+    return tf.experimental.dlpack.from_dlpack(torch.utils.dlpack.to_dlpack(t))
+
+
+def _assign(variable, t):
+    """Assign a torch tensor to a variable without a NumPy round trip."""
+    t = t.detach().contiguous()
+    if str(t.dtype).removeprefix("torch.") != variable.dtype:
+        # DLPack does not cast dtypes, so let `assign` convert from NumPy.
+        variable.assign(_np(t))
+        return
+    variable.assign(_to_backend_tensor(t, variable))
+
+
+def _resolve(layer, attr_path):
+    obj = layer
+    for attr in attr_path.split("."):
+        obj = getattr(obj, attr)
+    return obj
 
-        keras_hub_model.get_layer(
-            f"transformer_decoder_layer_{i}"
-        )._feedforward_layer_norm.gamma.assign(
-            hf_wts[f"decoder.layers.{i}.final_layer_norm.weight"].numpy()
+
+@contextlib.contextmanager
+def skip_weight_init():
+    """Create every variable with zeros instead of random initial values.
+
+    All weights are overwritten by the conversion, so drawing random values
+    for them (`~406M` for `bart_large_en`) is wasted work.
+    """
+    original_add_weight = keras.layers.Layer.add_weight
+
+    def add_weight(self, *args, **kwargs):
+        if len(args) > 1:
+            args = (args[0], "zeros", *args[2:])
+        else:
+            kwargs["initializer"] = "zeros"
+        return original_add_weight(self, *args, **kwargs)
+
+    keras.layers.Layer.add_weight = add_weight
+    try:
+        yield
+    finally:
+        keras.layers.Layer.add_weight = original_add_weight
+
+
+def _convert_layer(
+    keras_hub_model, hf_wts, stack, layer_spec, i, hidden_dim, num_heads
+):
+    # Look the layer up once, not once per weight.
+    layer = keras_hub_model.get_layer(f"transformer_{stack}_layer_{i}")
+    for hf_key, attr_path, kind in layer_spec:
+        value = RESHAPERS[kind](
+            hf_wts[f"{stack}.layers.{i}.{hf_key}"], hidden_dim, num_heads
         )
-        keras_hub_model.get_layer(
-            f"transformer_decoder_layer_{i}"
-        )._feedforward_layer_norm.beta.assign(
-            hf_wts[f"decoder.layers.{i}.final_layer_norm.bias"].numpy()
+        _assign(_resolve(layer, attr_path), value)
+
+
+def convert_checkpoints(hf_wts):
+    print("\n-> Convert original weights to KerasHub format.")
+
+    print("\n-> Load KerasHub model.")
+    with skip_weight_init():
+        keras_hub_model = keras_hub.models.BartBackbone.from_preset(
+            FLAGS.preset, load_weights=False
         )
 
+    print("Original weights:")
+    print(sorted(hf_wts.keys()))
+
+    hidden_dim = keras_hub_model.hidden_dim
+    num_heads = keras_hub_model.num_heads
+
+    # Token embedding weights shared by encoder and decoder.
+    _assign(
+        keras_hub_model.get_layer("token_embedding").embeddings,
+        hf_wts["shared.weight"],
+    )
+
+    for stack, layer_spec in (
+        ("encoder", ENCODER_LAYER_SPEC),
+        ("decoder", DECODER_LAYER_SPEC),
+    ):
+        # HF offsets BART positions by 2. `narrow` drops those rows as a view
+        # of the loaded tensor, which `_assign` then hands over without a copy.
+        position_embeddings = hf_wts[f"{stack}.embed_positions.weight"]
+        _assign(
+            keras_hub_model.get_layer(
+                f"{stack}_position_embedding"
+            ).position_embeddings,
+            position_embeddings.narrow(0, 2, position_embeddings.shape[0] - 2),
+        )
+
+        embeddings_layer_norm = keras_hub_model.get_layer(
+            f"{stack}_embeddings_layer_norm"
+        )
+        _assign(
+            embeddings_layer_norm.gamma,
+            hf_wts[f"{stack}.layer_norm_embedding.weight"],
+        )
+        _assign(
+            embeddings_layer_norm.beta,
+            hf_wts[f"{stack}.layer_norm_embedding.bias"],
+        )
+
+        # Layers touch disjoint weights, and both the torch copies and the
+        # assigns release the GIL, so convert them in parallel.
+        convert_layer = functools.partial(
+            _convert_layer,
+            keras_hub_model,
+            hf_wts,
+            stack,
+            layer_spec,
+            hidden_dim=hidden_dim,
+            num_heads=num_heads,
+        )
+        num_layers = keras_hub_model.num_layers
+        with ThreadPoolExecutor(max_workers=min(8, num_layers)) as executor:
+            list(executor.map(convert_layer, range(num_layers)))
+
     # Save the model.
     print("\n-> Save KerasHub model weights.")
-    keras_hub_model.save_weights(os.path.join(FLAGS.preset, "model.h5"))
+    keras_hub_model.save_weights(os.path.join(FLAGS.preset, "model.weights.h5"))
 
     return keras_hub_model
 
@@ -398,6 +347,15 @@ def extract_vocab(hf_tokenizer):
     return keras_hub_tokenizer
 
 
+def print_difference(keras_hub_output, hf_output):
+    # `mean(a - b) == mean(a) - mean(b)`, so no difference array is needed.
+    print("Difference:", keras_hub_output.mean() - hf_output.mean())
+    # The max needs the differences themselves, so reuse a single buffer.
+    abs_diff = np.subtract(keras_hub_output, hf_output)
+    np.abs(abs_diff, out=abs_diff)
+    print("Max absolute difference:", abs_diff.max())
+
+
 def check_output(
     keras_hub_tokenizer,
     keras_hub_model,
@@ -413,60 +371,61 @@ def check_output(
     ]
 
     # KerasHub
-    keras_hub_enc_token_ids = keras_hub_tokenizer(
-        tf.constant(enc_sample_text)
-    ).to_tensor()
-    keras_hub_enc_token_ids = tf.concat(
-        [
-            tf.constant([[keras_hub_tokenizer.start_token_id]]),
-            keras_hub_enc_token_ids,
-            tf.constant([[keras_hub_tokenizer.end_token_id]]),
-        ],
-        axis=-1,
-    )
-    keras_hub_dec_token_ids = keras_hub_tokenizer(
-        tf.constant(dec_sample_text)
-    ).to_tensor()
-    keras_hub_dec_token_ids = tf.concat(
-        [
-            tf.constant([[keras_hub_tokenizer.start_token_id]]),
-            keras_hub_dec_token_ids,
-            tf.constant([[keras_hub_tokenizer.end_token_id]]),
-        ],
-        axis=-1,
-    )
+    def pack(sample_text):
+        # Eager tokenizer calls return python lists, so add the start and end
+        # ids and pad in python, then build the tensor with a single op.
+        token_ids = [
+            [keras_hub_tokenizer.start_token_id]
+            + ids
+            + [keras_hub_tokenizer.end_token_id]
+            for ids in keras_hub_tokenizer(sample_text)
+        ]
+        length = max(len(ids) for ids in token_ids)
+        token_ids = [
+            ids + [keras_hub_tokenizer.pad_token_id] * (length - len(ids))
+            for ids in token_ids
+        ]
+        return keras.ops.convert_to_tensor(token_ids, dtype="int32")
+
+    keras_hub_enc_token_ids = pack(enc_sample_text)
+    keras_hub_dec_token_ids = pack(dec_sample_text)
     keras_hub_inputs = {
         "encoder_token_ids": keras_hub_enc_token_ids,
-        "encoder_padding_mask": keras_hub_enc_token_ids
-        != keras_hub_tokenizer.pad_token_id,
+        "encoder_padding_mask": keras.ops.not_equal(
+            keras_hub_enc_token_ids, keras_hub_tokenizer.pad_token_id
+        ),
         "decoder_token_ids": keras_hub_dec_token_ids,
-        "decoder_padding_mask": keras_hub_dec_token_ids
-        != keras_hub_tokenizer.pad_token_id,
+        "decoder_padding_mask": keras.ops.not_equal(
+            keras_hub_dec_token_ids, keras_hub_tokenizer.pad_token_id
+        ),
     }
-    keras_hub_output = keras_hub_model.predict(keras_hub_inputs)
+    # A single direct call avoids the dataset and step function setup of
+    # `predict()`, which is only worthwhile over many batches.
+    keras_hub_output = keras.tree.map_structure(
+        keras.ops.convert_to_numpy,
+        keras_hub_model(keras_hub_inputs, training=False),
+    )
 
     # HF
     hf_enc_inputs = hf_tokenizer(enc_sample_text, return_tensors="pt")
     hf_dec_inputs = hf_tokenizer(dec_sample_text, return_tensors="pt")
 
-    hf_output = hf_model(
-        **hf_enc_inputs,
-        decoder_input_ids=hf_dec_inputs["input_ids"],
-        decoder_attention_mask=hf_dec_inputs["attention_mask"],
-    )
+    with torch.inference_mode():
+        hf_output = hf_model(
+            **hf_enc_inputs,
+            decoder_input_ids=hf_dec_inputs["input_ids"],
+            decoder_attention_mask=hf_dec_inputs["attention_mask"],
+        )
 
     print("Encoder Outputs:")
     print(
         "KerasHub output:",
         keras_hub_output["encoder_sequence_output"][0, 0, :10],
     )
-    print("HF output:", hf_output.encoder_last_hidden_state[0, 0, :10])
-    print(
-        "Difference:",
-        np.mean(
-            keras_hub_output["encoder_sequence_output"]
-            - hf_output.encoder_last_hidden_state.detach().numpy()
-        ),
+    print("HF output:", _np(hf_output.encoder_last_hidden_state[0, 0, :10]))
+    print_difference(
+        keras_hub_output["encoder_sequence_output"],
+        _np(hf_output.encoder_last_hidden_state),
     )
 
     print("Decoder Outputs:")
@@ -474,19 +433,16 @@ def check_output(
         "KerasHub output:",
         keras_hub_output["decoder_sequence_output"][0, 0, :10],
     )
-    print("HF output:", hf_output.last_hidden_state[0, 0, :10])
-    print(
-        "Difference:",
-        np.mean(
-            keras_hub_output["decoder_sequence_output"]
-            - hf_output.last_hidden_state.detach().numpy()
-        ),
+    print("HF output:", _np(hf_output.last_hidden_state[0, 0, :10]))
+    print_difference(
+        keras_hub_output["decoder_sequence_output"],
+        _np(hf_output.last_hidden_state),
     )
 
     # Show the MD5 checksum of the model weights.
     print(
         "Model md5sum: ",
-        get_md5_checksum(os.path.join(FLAGS.preset, "model.h5")),
+        get_md5_checksum(os.path.join(FLAGS.preset, "model.weights.h5")),
     )
 
 
@@ -495,15 +451,20 @@ def main(_):
 
     hf_model_name = PRESET_MAP[FLAGS.preset]
 
-    print("\n-> Load HF model and HF tokenizer.")
-    hf_model = transformers.AutoModel.from_pretrained(hf_model_name)
-    hf_model.eval()
+    print("\n-> Load HF weights and HF tokenizer.")
+    hf_wts = load_hf_weights(hf_model_name)
     hf_tokenizer = transformers.AutoTokenizer.from_pretrained(hf_model_name)
 
-    keras_hub_model = convert_checkpoints(hf_model)
+    keras_hub_model = convert_checkpoints(hf_wts)
     print("\n -> Load KerasHub tokenizer.")
     keras_hub_tokenizer = extract_vocab(hf_tokenizer)
 
+    # The full HF model is only needed to check the outputs, so load it after
+    # the conversion is done.
+    print("\n-> Load HF model.")
+    hf_model = transformers.AutoModel.from_pretrained(hf_model_name)
+    hf_model.eval()
+
     check_output(
         keras_hub_tokenizer,
         keras_hub_model,